@@ -1,12 +1,14 @@
 import os
-from dotenv import load_dotenv
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain_community.document_loaders import WebBaseLoader
 from src.models.model import embed_model
 
 
-load_dotenv()
+# Chroma serves queries from an HNSW index; use cosine distance to match how
+# embeddings are compared elsewhere (e.g. the semantic cache).
+COLLECTION_METADATA = {"hnsw:space": "cosine"}
+
 
 def create_vectorstore():
     chroma_path = "./chroma_langchain_db"
@@ -17,8 +19,9 @@ def create_vectorstore():
             persist_directory=chroma_path,
             embedding_function=embed_model,
             collection_name="rag-chroma",
+            collection_metadata=COLLECTION_METADATA,
         )
-        return vectorstore.as_retriever()
+        return vectorstore
 
     print("Creating new vector store...")
     urls = [
@@ -38,11 +41,13 @@ def create_vectorstore():
     vectorstore = Chroma.from_documents(
         documents=doc_splits,
         collection_name="rag-chroma",
+        collection_metadata=COLLECTION_METADATA,
         embedding=embed_model,
         persist_directory=chroma_path,
     )
 
     print("Vector store created!")
-    return vectorstore.as_retriever()
+    return vectorstore
 
-retriever = create_vectorstore()
\ No newline at end of file
+vectorstore = create_vectorstore()
+retriever = vectorstore.as_retriever()
\ No newline at end of file
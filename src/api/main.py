@@ -0,0 +1,26 @@
+import bootstrap  # noqa: F401
+from fastapi import FastAPI
+from pydantic import BaseModel
+from workflow.graph import app
+
+api = FastAPI(title="Adaptive RAG")
+
+
+class AskRequest(BaseModel):
+    question: str
+
+
+class AskResponse(BaseModel):
+    answer: str
+    # False when the retry budget ran out and the answer failed grading
+    accepted: bool
+
+
+@api.post("/ask", response_model=AskResponse)
+async def ask(request: AskRequest) -> AskResponse:
+    """Answer a question; concurrent requests share the server's event loop."""
+    result = await app.ainvoke(
+        {"question": request.question},
+        config={"configurable": {"schedule_generation": True}},
+    )
+    return AskResponse(answer=result["generation"], accepted=result["accepted"])
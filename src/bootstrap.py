@@ -0,0 +1,10 @@
+"""Process-wide setup: load environment variables from .env exactly once.
+
+Import this before building any client that reads API keys from the environment.
+"""
+import os
+from dotenv import load_dotenv
+
+if not os.getenv("_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
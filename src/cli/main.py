@@ -1,8 +1,8 @@
-from dotenv import load_dotenv
+import asyncio
+import bootstrap  # noqa: F401
+from workflow.chains.generation import GENERATION_RUN_NAME
 from workflow.graph import app
 
-load_dotenv()
-
 
 def format_response(result):
     """Extract response from workflow result."""
@@ -14,30 +14,62 @@ def format_response(result):
         return str(result)
 
 
-def main():
-    """CLI for adaptive RAG system."""
+async def ask(question):
+    """Run the workflow, printing answer tokens as they stream in.
+
+    Returns the final state and the text of the last streamed generation (None
+    if nothing was streamed, e.g. the answer came from the cache).
+    """
+    result = None
+    streamed = None
+    async for event in app.astream_events({"question": question}, version="v2"):
+        kind = event["event"]
+        if event["name"] == GENERATION_RUN_NAME and kind == "on_chain_start":
+            # Later generations replace an answer the graders rejected
+            print("\nAnswer: " if streamed is None else "\n(regenerating...)\n", end="", flush=True)
+            streamed = ""
+        elif event["name"] == GENERATION_RUN_NAME and kind == "on_chain_stream":
+            print(event["data"]["chunk"], end="", flush=True)
+            streamed += event["data"]["chunk"]
+        elif kind == "on_chain_end" and not event["parent_ids"]:
+            result = event["data"]["output"]
+    return result, streamed
+
+
+async def chat():
+    """Interactive loop; the workflow has async nodes so it runs on one event loop."""
     print("Adaptive RAG System")
     print("Type 'quit' to exit.\n")
-    
+
     while True:
         try:
             question = input("Question: ").strip()
-            
+
             if question.lower() in ['quit', 'exit', 'q', '']:
                 break
-                
+
             print("Processing...")
-            result = None
-            for output in app.stream({"question": question}):
-                for key, value in output.items():
-                    result = value
-                    
-            if result:
-                print(f"\nAnswer: {format_response(result)}")
-            else:
+            result, streamed = await ask(question)
+
+            if streamed is not None:
+                print()
+            if not result:
                 print("No response generated.")
-                
+            elif format_response(result) != streamed:
+                # The final answer wasn't the one streamed last (e.g. a cache hit)
+                print(f"\nAnswer: {format_response(result)}")
+            if isinstance(result, dict) and result.get("accepted") is False:
+                print("(This answer did not pass the grounding/usefulness checks.)")
+
         except KeyboardInterrupt:
             break
         except Exception as e:
-            print(f"Error: {str(e)}")
\ No newline at end of file
+            print(f"Error: {str(e)}")
+
+
+def main():
+    """CLI for adaptive RAG system."""
+    try:
+        asyncio.run(chat())
+    except KeyboardInterrupt:
+        pass
@@ -1,11 +1,51 @@
-from dotenv import load_dotenv
+import asyncio
+import os
+from functools import lru_cache
+import bootstrap  # noqa: F401  (loads .env before the clients below read their keys)
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 
-load_dotenv()
+# Provider limit on texts per embedding request
+EMBED_BATCH_SIZE = 100
+
+# Upper bound on in-flight LLM requests across all concurrent workflow runs
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
 
 llm_model = ChatGoogleGenerativeAI(
     model="gemini-2.5-flash",
     temperature=0
 )
 
-embed_model = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
\ No newline at end of file
+_embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
+
+# Embeddings are cached on disk keyed by the SHA-256 of the text, so unchanged chunks
+# are not re-embedded when the vector store is rebuilt and repeated questions skip
+# the API. Cache misses are embedded EMBED_BATCH_SIZE texts per request. Gemini
+# embeds queries and documents differently (RETRIEVAL_QUERY vs RETRIEVAL_DOCUMENT),
+# so queries get their own store rather than sharing keys with documents.
+embed_model = CacheBackedEmbeddings.from_bytes_store(
+    _embeddings,
+    LocalFileStore("./embedding_cache"),
+    namespace=_embeddings.model,
+    batch_size=EMBED_BATCH_SIZE,
+    query_embedding_cache=LocalFileStore("./embedding_cache/queries"),
+    key_encoder="sha256",
+)
+
+
+@lru_cache(maxsize=None)
+def structured_llm(schema):
+    """Shared structured-output runnable for ``schema``.
+
+    ``with_structured_output`` derives the JSON schema when it binds, so memoizing
+    it means each schema is converted once per process, however many chains use it.
+    """
+    return llm_model.with_structured_output(schema)
+
+
+async def ainvoke_bounded(runnable, inputs):
+    """``runnable.ainvoke(inputs)``, waiting for a free slot under ``llm_semaphore``."""
+    async with llm_semaphore:
+        return await runnable.ainvoke(inputs)
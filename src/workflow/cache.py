@@ -0,0 +1,126 @@
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence
+import numpy as np
+from langchain.schema import Document
+
+
+def documents_hash(documents: Sequence[Document]) -> str:
+    """Stable fingerprint of a set of documents, used to scope cache entries to a context."""
+    digest = hashlib.md5()
+    for d in documents:
+        digest.update(d.page_content.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SemanticCache:
+    """In-process LRU cache looked up by cosine similarity of embeddings.
+
+    Entries are scoped by a tag (e.g. a hash of the documents), so a hit requires
+    an exact tag match and a key embedding within ``threshold`` of a stored one.
+    Keys are kept as rows of one normalized float32 matrix so a lookup is a single
+    matrix-vector product; once full, the least recently used row is overwritten.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_size: int = 256):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.keys: Optional[np.ndarray] = None
+        self.tags: List[str] = []
+        self.values: List[str] = []
+        self.last_used: List[int] = []
+        self._clock = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        return vec / np.linalg.norm(vec)
+
+    def _touch(self, idx: int) -> None:
+        self._clock += 1
+        self.last_used[idx] = self._clock
+
+    def _match(self, vec: np.ndarray, tag: str) -> Optional[int]:
+        if self.keys is None:
+            return None
+        scores = self.keys @ vec
+        scores[np.array([t != tag for t in self.tags])] = -np.inf
+        best = int(np.argmax(scores))
+        return best if scores[best] >= self.threshold else None
+
+    def get(self, vector: Sequence[float], tag: str) -> Optional[str]:
+        idx = self._match(self._normalize(vector), tag)
+        if idx is None:
+            return None
+        self._touch(idx)
+        return self.values[idx]
+
+    def set(self, vector: Sequence[float], tag: str, value: str) -> None:
+        vec = self._normalize(vector)
+        idx = self._match(vec, tag)
+        if idx is None and len(self) >= self.max_size:
+            idx = int(np.argmin(self.last_used))
+        if idx is None:
+            self.keys = vec[np.newaxis, :] if self.keys is None else np.vstack([self.keys, vec])
+            self.tags.append(tag)
+            self.values.append(value)
+            self.last_used.append(0)
+            idx = len(self) - 1
+        else:
+            self.keys[idx] = vec
+            self.tags[idx] = tag
+            self.values[idx] = value
+        self._touch(idx)
+
+
+class VerdictCache:
+    """Relevance verdicts persisted in SQLite, keyed by document id and question hash.
+
+    Documents without an id are never cached. Calls do blocking I/O, so async
+    callers should run them in a thread. Each call opens its own connection, so
+    the cache can be shared by threads and by several processes (e.g. uvicorn
+    workers), but SQLite allows one writer at a time: concurrent writes wait on
+    the database lock for up to ``timeout`` seconds.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, verdict TEXT NOT NULL)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with db:  # commits on success, rolls back on error
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def key(doc_id: str, question: str) -> str:
+        return f"{doc_id}:{hashlib.sha256(question.encode('utf-8')).hexdigest()}"
+
+    def get_many(self, doc_ids: Sequence[Optional[str]], question: str) -> List[Optional[str]]:
+        keys = [self.key(i, question) for i in doc_ids if i]
+        if not keys:
+            return [None] * len(doc_ids)
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT key, verdict FROM verdicts WHERE key IN ({', '.join('?' * len(keys))})", keys
+            )
+            found = dict(rows.fetchall())
+        return [found.get(self.key(i, question)) if i else None for i in doc_ids]
+
+    def set_many(self, doc_ids: Sequence[Optional[str]], question: str, verdicts: Sequence[str]) -> None:
+        rows = [(self.key(i, question), v) for i, v in zip(doc_ids, verdicts) if i]
+        if not rows:
+            return
+        with self._connect() as db:
+            db.executemany("INSERT OR REPLACE INTO verdicts (key, verdict) VALUES (?, ?)", rows)
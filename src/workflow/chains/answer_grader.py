@@ -1,14 +1,13 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableSequence
 from pydantic import BaseModel, Field
-from models.model import llm_model
+from models.model import structured_llm
 
 class GradeAnswer(BaseModel):
 
     binary_score: bool = Field(description="Answer addresses the question, 'yes' or 'no'")
 
-llm =  llm_model
-structured_llm_grader = llm.with_structured_output(GradeAnswer)
+structured_llm_grader = structured_llm(GradeAnswer)
 
 system = """You are a grader assessing whether an answer addresses / resolves a question \n 
      Give a binary score 'yes' or 'no'. Yes' means that the answer resolves the question."""
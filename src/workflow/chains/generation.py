@@ -4,4 +4,6 @@ from models.model import llm_model
 
 llm = llm_model
 prompt = hub.pull("rlm/rag-prompt")
-generation_chain = prompt | llm | StrOutputParser()
\ No newline at end of file
+# Named so callers of app.astream_events can pick the answer tokens out of the stream
+GENERATION_RUN_NAME = "generation"
+generation_chain = (prompt | llm | StrOutputParser()).with_config(run_name=GENERATION_RUN_NAME)
\ No newline at end of file
@@ -1,7 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableSequence
 from pydantic import BaseModel, Field
-from models.model import llm_model
+from models.model import structured_llm
 
 
 class GradeHallucinations(BaseModel):
@@ -9,8 +9,7 @@ class GradeHallucinations(BaseModel):
     binary_score: str = Field(description="Answer is grounded in the facts, 'yes' or 'no'")
 
 
-llm = llm_model
-structured_llm_grader = llm.with_structured_output(GradeHallucinations)
+structured_llm_grader = structured_llm(GradeHallucinations)
 
 system = """You are a grader assessing whether an LLM generation is grounded in / supported by a set of retrieved facts. \n 
      Give a binary score 'yes' or 'no'. 'Yes' means that the answer is grounded in / supported by the set of facts."""
@@ -1,6 +1,6 @@
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
-from models.model import llm_model
+from models.model import structured_llm
 
 
 class GradeDocuments(BaseModel):
@@ -8,8 +8,7 @@ class GradeDocuments(BaseModel):
     binary_score: str = Field(description="Documents are relevant to the question, 'yes' or 'no'")
 
 
-llm = llm_model
-structured_llm_grader = llm.with_structured_output(GradeDocuments)
+structured_llm_grader = structured_llm(GradeDocuments)
 
 system = """You are a strict grader assessing relevance of a retrieved document to a user question.
 
@@ -23,11 +22,49 @@ Only grade as relevant if the document contains information that directly helps
 
 Give a binary score 'yes' or 'no'."""
 
+# The question comes before the document so per-document calls share a common
+# prefix. This is a no-op at current prompt sizes: Gemini's implicit caching needs
+# a prefix of roughly 1K tokens, and these prompts are far shorter.
 grade_prompt = ChatPromptTemplate.from_messages(
     [
         ("system", system),
-        ("human", "Retrieved document: \n\n {document} \n\n User question: {question}"),
+        ("human", "User question: {question} \n\n Retrieved document: \n\n {document}"),
     ]
 )
 
-retrieval_grader = grade_prompt | structured_llm_grader
\ No newline at end of file
+retrieval_grader = grade_prompt | structured_llm_grader
+
+class GradeDocumentsBatch(BaseModel):
+
+    scores: list[str] = Field(
+        description="One 'yes' or 'no' per retrieved document, in the order the documents were given"
+    )
+
+
+structured_llm_batch_grader = structured_llm(GradeDocumentsBatch)
+
+batch_system = """You are a strict grader assessing relevance of a numbered list of retrieved documents to a user question.
+
+A document must DIRECTLY address the user's question to be considered relevant.
+Do NOT grade a document as relevant if:
+- The document only shares a general topic area
+- There is only tangential or indirect connection
+- The document cannot help answer the specific question asked
+
+Only grade a document as relevant if it contains information that directly helps answer the question.
+
+Grade every document independently and return one binary score 'yes' or 'no' per document,
+in the same order as the documents are numbered."""
+
+batch_grade_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", batch_system),
+        ("human", "User question: {question} \n\n Retrieved documents: \n\n {documents}"),
+    ]
+)
+
+retrieval_batch_grader = batch_grade_prompt | structured_llm_batch_grader
+
+
+def format_documents(documents: list[str]) -> str:
+    return "\n\n".join(f"[DOC {i}]\n{doc}" for i, doc in enumerate(documents, start=1))
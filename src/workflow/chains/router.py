@@ -4,7 +4,7 @@ from pydantic import BaseModel, Field
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
-from models.model import llm_model
+from models.model import structured_llm
 
 
 class RouteQuery(BaseModel):
@@ -13,9 +13,7 @@ class RouteQuery(BaseModel):
         description="Given a user question choose to route it to web search or a vectorstore.",
     )
 
-llm = llm_model
-
-structured_llm_router = llm.with_structured_output(RouteQuery)
+structured_llm_router = structured_llm(RouteQuery)
 
 system = """You are an expert at routing a user question to a vectorstore or web search.
 The vectorstore contains documents related to agents, prompt engineering, and adversarial attacks.
@@ -2,4 +2,5 @@
 RETRIEVE = "retrieve"
 GRADE_DOCUMENTS = "grade_documents"  
 GENERATE = "generate"
-WEBSEARCH = "websearch"
\ No newline at end of file
+WEBSEARCH = "websearch"
+ACCEPT = "accept"
\ No newline at end of file
@@ -1,40 +1,87 @@
-from dotenv import load_dotenv
+import asyncio
+from collections import OrderedDict
 from langgraph.graph import END, StateGraph
+from models.model import ainvoke_bounded
 from workflow.chains.answer_grader import answer_grader
 from workflow.chains.hallucination_grader import hallucination_grader
 from workflow.chains.router import RouteQuery, question_router
-from workflow.consts import GENERATE, GRADE_DOCUMENTS, RETRIEVE, WEBSEARCH
-from workflow.nodes.generate import generate
+from workflow.consts import ACCEPT, GENERATE, GRADE_DOCUMENTS, RETRIEVE, WEBSEARCH
+from workflow.nodes.generate import accept_answer, generate
 from workflow.nodes.grade_documents import grade_documents
 from workflow.nodes.retrieve import retrieve
 from workflow.nodes.web_search import web_search
 from workflow.state import GraphState
 
 
-load_dotenv()
+# Regenerations allowed for one context before escalating to web search
+MAX_GENERATION_RETRIES = 1
+# Web searches a turn may fall back to after a rejected answer; once spent, the
+# last answer is returned with accepted=False instead of searching again
+MAX_WEB_ESCALATIONS = 1
+
+def escalate_to_web_search(state: GraphState, outcome: str) -> str:
+    if state.get("web_escalations", 0) >= MAX_WEB_ESCALATIONS:
+        print("---RETRY BUDGET EXHAUSTED, RETURNING LAST ANSWER---")
+        return "budget exhausted"
+    return outcome
 
 def decide_to_generate(state):
     print("---ASSESS DOCUMENTS---")
     return WEBSEARCH if state["web_search"] else GENERATE
 
-def grade_generation_grounded_in_documents_and_question(state: GraphState):
+async def grade_generation_grounded_in_documents_and_question(state: GraphState):
     print("---CHECK HALLUCINATIONS---")
     question = state["question"]
     documents = state["documents"]
     generation = state["generation"]
 
-    score = hallucination_grader.invoke({"documents": documents, "generation": generation})
+    # Grade the answer speculatively alongside the hallucination check; the
+    # answer grade is discarded if the generation turns out not to be grounded.
+    hallucination_task = asyncio.create_task(
+        ainvoke_bounded(hallucination_grader, {"documents": documents, "generation": generation})
+    )
+    answer_task = asyncio.create_task(
+        ainvoke_bounded(answer_grader, {"question": question, "generation": generation})
+    )
+    # Retrieve the outcome of a discarded answer grade so its errors aren't logged as unhandled
+    answer_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    try:
+        score = await hallucination_task
+    except BaseException:
+        answer_task.cancel()
+        raise
 
-    if score.binary_score:
-        score = answer_grader.invoke({"question": question, "generation": generation})
-        return "useful" if score.binary_score else "not useful"
+    if score.binary_score.lower() == "yes":
+        score = await answer_task
+        if score.binary_score:
+            return "useful"
+        return escalate_to_web_search(state, "not useful")
     else:
+        answer_task.cancel()
+        if state.get("gen_retries", 0) >= MAX_GENERATION_RETRIES:
+            print("---GENERATION RETRIES EXHAUSTED---")
+            return escalate_to_web_search(state, "retries exhausted")
         return "not supported"
     
-def route_question(state: GraphState) -> str:
+# LRU of question -> datasource; functools.lru_cache can't memoize coroutines
+ROUTE_CACHE_SIZE = 1024
+_route_cache: "OrderedDict[str, str]" = OrderedDict()
+
+async def _route_cached(question: str) -> str:
+    if question in _route_cache:
+        _route_cache.move_to_end(question)
+        return _route_cache[question]
+    source: RouteQuery = await ainvoke_bounded(question_router, {"question": question})
+    _route_cache[question] = source.datasource
+    if len(_route_cache) > ROUTE_CACHE_SIZE:
+        _route_cache.popitem(last=False)
+    return source.datasource
+
+async def route_question(state: GraphState) -> str:
     print("---ROUTE QUESTION---")
-    source: RouteQuery = question_router.invoke({"question": state["question"]})
-    return WEBSEARCH if source.datasource == WEBSEARCH else RETRIEVE
+    datasource = await _route_cached(state["question"])
+    return WEBSEARCH if datasource == WEBSEARCH else RETRIEVE
 
 
 # Build workflow
@@ -43,6 +90,7 @@ workflow.add_node(RETRIEVE, retrieve)
 workflow.add_node(GRADE_DOCUMENTS, grade_documents)
 workflow.add_node(GENERATE, generate)
 workflow.add_node(WEBSEARCH, web_search)
+workflow.add_node(ACCEPT, accept_answer)
 
 workflow.set_conditional_entry_point(
     route_question,
@@ -58,10 +106,20 @@ workflow.add_conditional_edges(
 workflow.add_conditional_edges(
     GENERATE,
     grade_generation_grounded_in_documents_and_question,
-    {"not supported": GENERATE, "useful": END, "not useful": WEBSEARCH},
+    {
+        "not supported": GENERATE,
+        "retries exhausted": WEBSEARCH,
+        "budget exhausted": END,
+        "useful": ACCEPT,
+        "not useful": WEBSEARCH,
+    },
 )
 workflow.add_edge(WEBSEARCH, GENERATE)
+workflow.add_edge(ACCEPT, END)
 
 app = workflow.compile()
 
-app.get_graph().draw_mermaid_png(output_file_path="graph.png")
\ No newline at end of file
+if __name__ == "__main__":
+    # Rendering goes through mermaid.ink, so only do it on request, from the repo root:
+    #   PYTHONPATH=src python -m workflow.graph
+    app.get_graph().draw_mermaid_png(output_file_path="graph.png")
\ No newline at end of file
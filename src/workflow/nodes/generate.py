@@ -1,11 +1,66 @@
 from typing import Any, Dict
+from langchain_core.runnables import RunnableConfig
+from models.model import embed_model, llm_semaphore
+from workflow.cache import SemanticCache, documents_hash
 from workflow.chains.generation import generation_chain
+from workflow.scheduler import GenerationScheduler
 from workflow.state import GraphState
 
+generation_cache = SemanticCache(threshold=0.95, max_size=256)
+generation_scheduler = GenerationScheduler(generation_chain, llm_semaphore)
 
-def generate(state: GraphState) -> Dict[str, Any]:
+
+async def generate(state: GraphState, config: RunnableConfig) -> Dict[str, Any]:
     print("---GENERATE---")
     question = state["question"]
     documents = state["documents"]
-    generation = generation_chain.invoke({"context": documents, "question": question})
-    return {"documents": documents, "question": question, "generation": generation}
\ No newline at end of file
+
+    question_embedding = state.get("question_embedding") or await embed_model.aembed_query(question)
+    context_key = documents_hash(documents)
+
+    # A previous generation in state means the hallucination grader rejected it
+    # (web_search clears it when the context changes), so this is a retry:
+    # regenerate instead of serving a cached answer.
+    retrying = bool(state.get("generation"))
+    gen_retries = state.get("gen_retries", 0) + 1 if retrying else 0
+
+    if not retrying:
+        cached = generation_cache.get(question_embedding, context_key)
+        if cached is not None:
+            print("---GENERATE: CACHE HIT---")
+            return {
+                "documents": documents,
+                "question": question,
+                "question_embedding": question_embedding,
+                "generation": cached,
+                "gen_retries": gen_retries,
+                "accepted": False,
+            }
+
+    inputs = {"context": documents, "question": question}
+    if config.get("configurable", {}).get("schedule_generation"):
+        # Non-streaming callers (the API) go through the shortest-first scheduler
+        generation = await generation_scheduler.submit(inputs, config)
+    else:
+        # Stream so tokens reach app.astream_events consumers as they are produced
+        generation = ""
+        async with llm_semaphore:
+            async for chunk in generation_chain.astream(inputs):
+                generation += chunk
+    return {
+        "documents": documents,
+        "question": question,
+        "question_embedding": question_embedding,
+        "generation": generation,
+        "gen_retries": gen_retries,
+        # Set by accept_answer once the graders pass the generation
+        "accepted": False,
+    }
+
+
+def accept_answer(state: GraphState) -> Dict[str, Any]:
+    """Mark an answer that passed grading and cache it for near-duplicate questions."""
+    generation_cache.set(
+        state["question_embedding"], documents_hash(state["documents"]), state["generation"]
+    )
+    return {"accepted": True}
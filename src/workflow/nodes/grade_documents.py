@@ -1,20 +1,132 @@
-from typing import Any, Dict
-from workflow.chains.retrieval_grader import retrieval_grader
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from langchain.schema import Document
+from data.ingestion import vectorstore
+from models.model import ainvoke_bounded
+from workflow.cache import VerdictCache
+from workflow.chains.retrieval_grader import (format_documents, retrieval_batch_grader,
+                                              retrieval_grader)
+from workflow.nodes.web_search import cancel_web_prefetch, start_web_prefetch
 from workflow.state import GraphState
 
+# Cosine similarity bounds for grading by embeddings alone; documents scoring in
+# between are borderline and go to the LLM grader. The defaults are uncalibrated,
+# conservative guesses for text-embedding-004 question/chunk pairs, meant to let
+# only clear matches and clear misses skip the LLM. Tune them against graded
+# examples from your corpus; GRADE_RELEVANT_SIMILARITY=2 with
+# GRADE_IRRELEVANT_SIMILARITY=-2 sends every document to the LLM.
+RELEVANT_SIMILARITY = float(os.getenv("GRADE_RELEVANT_SIMILARITY", "0.8"))
+IRRELEVANT_SIMILARITY = float(os.getenv("GRADE_IRRELEVANT_SIMILARITY", "0.5"))
 
-def grade_documents(state: GraphState) -> Dict[str, Any]:
+# Only LLM verdicts are persisted: embedding verdicts are cheap to recompute and
+# would go stale if the similarity bounds change.
+grade_cache = VerdictCache("./grade_cache.sqlite3")
+
+
+async def document_similarities(
+    question_embedding: Optional[List[float]], documents: Sequence[Document]
+) -> Optional[np.ndarray]:
+    """Cosine similarity of each document's stored embedding to the question.
+
+    Returns None when the question embedding or any document embedding is unavailable.
+    """
+    ids = [d.id for d in documents]
+    if question_embedding is None or not ids or not all(ids):
+        return None
+    # Chroma's get is synchronous, so keep it off the event loop
+    stored = await asyncio.to_thread(vectorstore.get, ids=ids, include=["embeddings"])
+    by_id = dict(zip(stored["ids"], stored["embeddings"]))
+    if any(i not in by_id for i in ids):
+        return None
+    doc_mat = np.asarray([by_id[i] for i in ids], dtype=np.float32)
+    q_vec = np.asarray(question_embedding, dtype=np.float32)
+    return doc_mat @ q_vec / (np.linalg.norm(doc_mat, axis=1) * np.linalg.norm(q_vec))
+
+
+async def grade_each(question: str, documents: List[str]) -> List[str]:
+    # Each grade is an independent LLM call, so run them concurrently
+    scores = await asyncio.gather(
+        *(
+            ainvoke_bounded(retrieval_grader, {"question": question, "document": d})
+            for d in documents
+        )
+    )
+    return [score.binary_score for score in scores]
+
+
+async def grade_batch(question: str, documents: List[str]) -> List[str]:
+    """Grade all documents in one LLM call, falling back to one call per document."""
+    if not documents:
+        return []
+    try:
+        score = await ainvoke_bounded(
+            retrieval_batch_grader,
+            {"question": question, "documents": format_documents(documents)},
+        )
+        if score is not None and len(score.scores) == len(documents):
+            return score.scores
+    except Exception as e:
+        print(f"---GRADE: BATCH GRADING FAILED ({e})---")
+    print("---GRADE: FALLING BACK TO PER-DOCUMENT GRADING---")
+    return await grade_each(question, documents)
+
+
+async def grade_with_llm(question: str, documents: Sequence[Document]) -> List[str]:
+    """Batch-grade documents with the LLM, reusing verdicts from earlier turns."""
+    ids = [d.id for d in documents]
+    grades = await asyncio.to_thread(grade_cache.get_many, ids, question)
+    misses = [i for i, grade in enumerate(grades) if grade is None]
+    if misses:
+        miss_grades = await grade_batch(question, [documents[i].page_content for i in misses])
+        for i, grade in zip(misses, miss_grades):
+            grades[i] = grade
+        await asyncio.to_thread(grade_cache.set_many, [ids[i] for i in misses], question, miss_grades)
+    return grades
+
+
+def web_search_likely(similarities: Optional[np.ndarray]) -> bool:
+    """Whether any document may fail grading: it hasn't cleared RELEVANT_SIMILARITY."""
+    return similarities is None or bool((similarities < RELEVANT_SIMILARITY).any())
+
+
+async def grade_relevance(
+    question: str, documents: Sequence[Document], similarities: Optional[np.ndarray]
+) -> List[str]:
+    """Grade by embedding similarity, sending only borderline documents to the LLM."""
+    if similarities is None:
+        return await grade_with_llm(question, documents)
+
+    grades = ["yes" if s >= RELEVANT_SIMILARITY else "no" for s in similarities]
+    borderline = [
+        i for i, s in enumerate(similarities) if IRRELEVANT_SIMILARITY < s < RELEVANT_SIMILARITY
+    ]
+    if borderline:
+        llm_grades = await grade_with_llm(question, [documents[i] for i in borderline])
+        for i, grade in zip(borderline, llm_grades):
+            grades[i] = grade
+    return grades
+
+
+async def grade_documents(state: GraphState) -> Dict[str, Any]:
     print("---CHECK DOCUMENT RELEVANCE TO QUESTION---")
     question = state["question"]
     documents = state["documents"]
+    similarities = await document_similarities(state.get("question_embedding"), documents)
+
+    # Start the web search once some document may be rejected, so it overlaps
+    # the LLM grading; it is dropped below if every document passes.
+    web_prefetch = start_web_prefetch(question) if web_search_likely(similarities) else None
+    try:
+        grades = await grade_relevance(question, documents, similarities)
+    except BaseException:
+        cancel_web_prefetch(web_prefetch)
+        raise
 
     filtered_docs = []
     web_search = False
-    for d in documents:
-        score = retrieval_grader.invoke(
-            {"question": question, "document": d.page_content}
-        )
-        grade = score.binary_score
+    for d, grade in zip(documents, grades):
         if grade.lower() == 'yes':
             print("---GRADE: DOCUMENT RELEVANT---")
             filtered_docs.append(d)
@@ -22,4 +134,13 @@ def grade_documents(state: GraphState) -> Dict[str, Any]:
             print("---GRADE: DOCUMENT NOT RELEVANT---")
             web_search = True
             continue
-    return {"documents": filtered_docs, "question": question, "web_search": web_search}
\ No newline at end of file
+
+    if not web_search:
+        cancel_web_prefetch(web_prefetch)
+        web_prefetch = None
+    return {
+        "documents": filtered_docs,
+        "question": question,
+        "web_search": web_search,
+        "web_prefetch": web_prefetch,
+    }
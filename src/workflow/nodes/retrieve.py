@@ -1,10 +1,17 @@
 from typing import Any, Dict
+from models.model import embed_model
 from workflow.state import GraphState
-from data.ingestion import retriever
+from data.ingestion import vectorstore
 
 
-def retrieve(state: GraphState) -> Dict[str, Any]:
+async def retrieve(state: GraphState) -> Dict[str, Any]:
     print("---RETRIEVE---")
     question = state["question"]
-    documents = retriever.invoke(question)
-    return {"documents": documents, "question": question}
\ No newline at end of file
+    # The question embedding is kept in state so later nodes don't re-embed
+    question_embedding = await embed_model.aembed_query(question)
+    documents = await vectorstore.asimilarity_search_by_vector(question_embedding)
+    return {
+        "documents": documents,
+        "question": question,
+        "question_embedding": question_embedding,
+    }
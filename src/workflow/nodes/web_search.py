@@ -1,29 +1,75 @@
-from typing import Any, Dict
-from dotenv import load_dotenv
+import asyncio
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import bootstrap  # noqa: F401  (loads .env before TavilySearch reads its key)
 from langchain.schema import Document
 from langchain_tavily import TavilySearch
 from workflow.state import GraphState
 
 
-load_dotenv()
-
 web_search_tool = TavilySearch(max_results=3)
 
-def web_search(state: GraphState) -> Dict[str, Any]:
+# Background searches started by grade_documents once a web search looks likely,
+# keyed by the token it keeps in state. Each is claimed by web_search or cancelled
+# by grade_documents; the bound only matters for turns that fail in between.
+MAX_WEB_PREFETCHES = 256
+_web_prefetches: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
+async def search_web(question: str) -> Document:
+    tavily_results = (await web_search_tool.ainvoke({"query": question}))["results"]
+    joined_tavily_result = "\n".join(
+        tavily_result["content"] for tavily_result in tavily_results
+    )
+    return Document(page_content=joined_tavily_result)
+
+async def _prefetch_web(question: str) -> Optional[Document]:
+    # A failed prefetch is not fatal; web_search will search again if needed
+    try:
+        return await search_web(question)
+    except Exception as e:
+        print(f"---WEB SEARCH PREFETCH FAILED ({e})---")
+        return None
+
+def start_web_prefetch(question: str) -> str:
+    """Start a web search in the background; returns the token web_search claims it with."""
+    token = uuid.uuid4().hex
+    _web_prefetches[token] = asyncio.create_task(_prefetch_web(question))
+    while len(_web_prefetches) > MAX_WEB_PREFETCHES:
+        _, task = _web_prefetches.popitem(last=False)
+        task.cancel()
+    return token
+
+def cancel_web_prefetch(token: Optional[str]) -> None:
+    task = _web_prefetches.pop(token, None) if token else None
+    if task is not None:
+        task.cancel()
+
+async def _claim_web_prefetch(token: Optional[str]) -> Optional[Document]:
+    task = _web_prefetches.pop(token, None) if token else None
+    if task is None or task.cancelled():
+        return None
+    return await task
+
+async def web_search(state: GraphState) -> Dict[str, Any]:
     print("---WEB SEARCH---")
     question = state["question"]
 
-    # Initialize documents
-    documents = state.get("documents", [])
+    # Use the search grade_documents started in the background, if there is one
+    web_results = await _claim_web_prefetch(state.get("web_prefetch")) or await search_web(question)
+    # Build a new list rather than appending to the one held in state
+    documents = [*state.get("documents", []), web_results]
 
-    tavily_results = web_search_tool.invoke({"query": question})["results"]
-    joined_tavily_result = "\n".join(
-        [tavily_result["content"] for tavily_result in tavily_results]
-    )
-    web_results = Document(page_content=joined_tavily_result)
-    if documents:
-        documents.append(web_results)
-    else:
-        documents = [web_results]
+    # A generation in state means this search is an escalation from a rejected
+    # answer; those are counted for the whole turn and never reset.
+    web_escalations = state.get("web_escalations", 0) + (1 if state.get("generation") else 0)
 
-    return {"documents": documents, "question": question}
\ No newline at end of file
+    # The context changed, so any earlier generation (and its retry count) is stale
+    return {
+        "documents": documents,
+        "question": question,
+        "web_prefetch": None,
+        "generation": None,
+        "gen_retries": 0,
+        "web_escalations": web_escalations,
+    }
@@ -1,9 +1,14 @@
-from typing import List, TypedDict
+from typing import List, Optional, TypedDict
 from langchain.schema import Document
 
 class GraphState(TypedDict):
     """State object for workflow containing query, documents, and control flags."""
     question: str
-    generation: str
+    generation: Optional[str]
+    accepted: bool
+    gen_retries: int
+    web_escalations: int
     web_search: bool
-    documents: List[Document]
\ No newline at end of file
+    documents: List[Document]
+    question_embedding: Optional[List[float]]
+    web_prefetch: Optional[str]
\ No newline at end of file
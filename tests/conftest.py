@@ -0,0 +1,127 @@
+import asyncio
+import sys
+import types
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+from langchain.schema import Document
+from langchain_core.runnables import RunnableLambda
+
+# Top-level packages re-imported against the stubs for each test that uses them
+STUBBED_PACKAGES = ("workflow", "models", "data", "langchain_tavily")
+
+
+class WorkflowStubs:
+    """Controls and call counts for the stubbed LLM, vectorstore and Tavily."""
+
+    def __init__(self):
+        self.route = "vectorstore"
+        self.grounded = "yes"
+        self.useful = True
+        self.batch_grade = "yes"
+        self.web_delay = 0.0
+        self.question_embedding = [1.0, 0.0]
+        self.doc_embedding = [1.0, 0.0]
+        # Per-id embeddings; when set, ids missing from it are missing from the store
+        self.doc_embeddings = None
+        self.documents = [Document(id=f"doc-{i}", page_content=f"document {i}") for i in range(2)]
+        self.calls = Counter()
+
+
+class FakeVectorstore:
+    def __init__(self, stubs: WorkflowStubs):
+        self.stubs = stubs
+
+    async def asimilarity_search_by_vector(self, embedding, k: int = 4):
+        self.stubs.calls["vectorstore"] += 1
+        return list(self.stubs.documents)
+
+    def get(self, ids, include):
+        stored = self.stubs.doc_embeddings
+        if stored is None:
+            stored = {i: self.stubs.doc_embedding for i in ids}
+        found = [i for i in ids if i in stored]
+        return {"ids": found, "embeddings": [stored[i] for i in found]}
+
+
+def _stub_modules(stubs: WorkflowStubs) -> dict:
+    async def aembed_query(text):
+        stubs.calls["embed"] += 1
+        return stubs.question_embedding
+
+    llm_semaphore = asyncio.Semaphore(8)
+
+    async def ainvoke_bounded(runnable, inputs):
+        async with llm_semaphore:
+            return await runnable.ainvoke(inputs)
+
+    def structured_llm(schema):
+        async def grade(prompt):
+            stubs.calls[schema.__name__] += 1
+            if schema.__name__ == "GradeDocumentsBatch":
+                return SimpleNamespace(scores=[stubs.batch_grade] * prompt.to_string().count("[DOC "))
+            if schema.__name__ == "GradeDocuments":
+                return SimpleNamespace(binary_score=stubs.batch_grade)
+            if schema.__name__ == "GradeHallucinations":
+                return SimpleNamespace(binary_score=stubs.grounded)
+            if schema.__name__ == "GradeAnswer":
+                return SimpleNamespace(binary_score=stubs.useful)
+            return SimpleNamespace(datasource=stubs.route)
+
+        return RunnableLambda(grade)
+
+    model = types.ModuleType("models.model")
+    model.llm_semaphore = llm_semaphore
+    model.ainvoke_bounded = ainvoke_bounded
+    model.structured_llm = structured_llm
+    model.embed_model = SimpleNamespace(aembed_query=aembed_query)
+
+    async def generate(inputs):
+        stubs.calls["generate"] += 1
+        return f"answer {stubs.calls['generate']}"
+
+    generation = types.ModuleType("workflow.chains.generation")
+    generation.GENERATION_RUN_NAME = "generation"
+    generation.generation_chain = RunnableLambda(generate).with_config(run_name="generation")
+
+    ingestion = types.ModuleType("data.ingestion")
+    ingestion.vectorstore = FakeVectorstore(stubs)
+
+    class TavilySearch:
+        def __init__(self, **kwargs):
+            pass
+
+        async def ainvoke(self, inputs):
+            stubs.calls["tavily"] += 1
+            await asyncio.sleep(stubs.web_delay)
+            return {"results": [{"content": "web result"}]}
+
+    tavily = types.ModuleType("langchain_tavily")
+    tavily.TavilySearch = TavilySearch
+
+    return {
+        "models.model": model,
+        "workflow.chains.generation": generation,
+        "data": types.ModuleType("data"),
+        "data.ingestion": ingestion,
+        "langchain_tavily": tavily,
+    }
+
+
+@pytest.fixture
+def workflow_stubs(tmp_path, monkeypatch):
+    """Import the real workflow modules with the LLM, Chroma and Tavily replaced by stubs."""
+    saved = {name: mod for name, mod in sys.modules.items() if name.split(".")[0] in STUBBED_PACKAGES}
+    for name in saved:
+        del sys.modules[name]
+
+    stubs = WorkflowStubs()
+    sys.modules.update(_stub_modules(stubs))
+    monkeypatch.chdir(tmp_path)
+    try:
+        yield stubs
+    finally:
+        for name in [n for n in sys.modules if n.split(".")[0] in STUBBED_PACKAGES]:
+            del sys.modules[name]
+        sys.modules.update(saved)
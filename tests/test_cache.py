@@ -0,0 +1,57 @@
+import numpy as np
+from langchain.schema import Document
+
+from workflow.cache import SemanticCache, VerdictCache, documents_hash
+
+
+def test_semantic_cache_hits_similar_key_with_same_tag() -> None:
+    cache = SemanticCache(threshold=0.95)
+    cache.set([1.0, 0.0, 0.0], "ctx", "answer")
+
+    assert cache.get([0.99, 0.05, 0.0], "ctx") == "answer"
+    assert cache.get([0.99, 0.05, 0.0], "other-ctx") is None
+    assert cache.get([0.0, 1.0, 0.0], "ctx") is None
+
+
+def test_semantic_cache_overwrites_matching_entry() -> None:
+    cache = SemanticCache(threshold=0.95)
+    cache.set([1.0, 0.0], "ctx", "old")
+    cache.set([1.0, 0.01], "ctx", "new")
+
+    assert len(cache) == 1
+    assert cache.get([1.0, 0.0], "ctx") == "new"
+
+
+def test_semantic_cache_stores_float32_keys() -> None:
+    cache = SemanticCache()
+    cache.set([3.0, 4.0], "ctx", "answer")
+
+    assert cache.keys.dtype == np.float32
+    assert np.allclose(cache.keys[0], [0.6, 0.8])
+
+
+def test_semantic_cache_evicts_least_recently_used() -> None:
+    cache = SemanticCache(threshold=0.95, max_size=2)
+    cache.set([1.0, 0.0, 0.0], "ctx", "a")
+    cache.set([0.0, 1.0, 0.0], "ctx", "b")
+    cache.get([1.0, 0.0, 0.0], "ctx")
+    cache.set([0.0, 0.0, 1.0], "ctx", "c")
+
+    assert cache.get([1.0, 0.0, 0.0], "ctx") == "a"
+    assert cache.get([0.0, 1.0, 0.0], "ctx") is None
+
+
+def test_documents_hash_depends_on_content() -> None:
+    docs = [Document(page_content="a"), Document(page_content="b")]
+
+    assert documents_hash(docs) == documents_hash([Document(page_content="a"), Document(page_content="b")])
+    assert documents_hash(docs) != documents_hash(docs[:1])
+
+
+def test_verdict_cache_persists_by_document_and_question(tmp_path) -> None:
+    path = str(tmp_path / "verdicts")
+    VerdictCache(path).set_many(["doc-1", None], "what is an agent?", ["yes", "no"])
+
+    cache = VerdictCache(path)
+    assert cache.get_many(["doc-1", "doc-2", None], "what is an agent?") == ["yes", None, None]
+    assert cache.get_many(["doc-1"], "how to cook pasta") == [None]
@@ -1,12 +1,9 @@
 from pprint import pprint
 import pytest
-from dotenv import load_dotenv
-
-load_dotenv()
-
 from workflow.chains.generation import generation_chain
 from workflow.chains.hallucination_grader import (GradeHallucinations, hallucination_grader)
-from workflow.chains.retrieval_grader import GradeDocuments, retrieval_grader
+from workflow.chains.retrieval_grader import (GradeDocuments, GradeDocumentsBatch, format_documents,
+                                              retrieval_batch_grader, retrieval_grader)
 from workflow.chains.router import RouteQuery, question_router
 from data.ingestion import retriever
 
@@ -36,6 +33,18 @@ def test_retrieval_grader_answer_no() -> None:
     assert res.binary_score == "no"
 
 
+def test_retrieval_batch_grader_scores_each_document() -> None:
+    question = "What are the key components of an LLM-powered autonomous agent system?"
+    docs = retriever.invoke(question)
+    doc_txts = [docs[1].page_content, "To bake a perfect chocolate cake, preheat the oven to 350 degrees"]
+
+    res: GradeDocumentsBatch = retrieval_batch_grader.invoke(
+        {"question": question, "documents": format_documents(doc_txts)}
+    )
+
+    assert res.scores == ["yes", "no"]
+
+
 def test_generation_chain() -> None:
     question = "How do language models work?"
     docs = retriever.invoke(question)
@@ -0,0 +1,125 @@
+import asyncio
+import math
+
+import pytest
+from langchain.schema import Document
+
+QUESTION = "What is agent memory?"
+
+
+def grade(stubs) -> dict:
+    from workflow.nodes.grade_documents import grade_documents
+
+    state = {
+        "question": QUESTION,
+        "documents": list(stubs.documents),
+        "question_embedding": stubs.question_embedding,
+    }
+    return asyncio.run(grade_documents(state))
+
+
+def test_llm_verdicts_are_reused_across_turns(workflow_stubs) -> None:
+    # cosine similarity 0.6: borderline, so graded by the LLM
+    workflow_stubs.doc_embedding = [0.6, 0.8]
+
+    grade(workflow_stubs)
+    result = grade(workflow_stubs)
+
+    assert workflow_stubs.calls["GradeDocumentsBatch"] == 1
+    assert len(result["documents"]) == 2
+
+
+def test_embedding_verdicts_are_not_persisted(workflow_stubs) -> None:
+    from workflow.nodes.grade_documents import grade_cache
+
+    grade(workflow_stubs)
+
+    ids = [d.id for d in workflow_stubs.documents]
+    assert grade_cache.get_many(ids, QUESTION) == [None, None]
+    assert workflow_stubs.calls["GradeDocumentsBatch"] == 0
+
+
+def embedding_at(similarity: float) -> list:
+    """A 2-d embedding with the given cosine similarity to the stubbed question [1, 0]."""
+    return [similarity, math.sqrt(1 - similarity ** 2)]
+
+
+def fake_grade_batch(monkeypatch, grading, grades: list) -> list:
+    """Replace the LLM batch grader; returns the list of texts it is asked to grade."""
+    graded = []
+
+    async def grade_batch(question, documents):
+        graded.extend(documents)
+        return grades[: len(documents)]
+
+    monkeypatch.setattr(grading, "grade_batch", grade_batch)
+    return graded
+
+
+def test_similarity_bands_send_only_borderline_documents_to_llm(workflow_stubs, monkeypatch) -> None:
+    import workflow.nodes.grade_documents as grading
+
+    documents = [Document(id=f"doc-{i}", page_content=f"document {i}") for i in range(4)]
+    similarities = [0.9, 0.7, 0.2, 0.6]
+    workflow_stubs.doc_embeddings = {d.id: embedding_at(s) for d, s in zip(documents, similarities)}
+    graded = fake_grade_batch(monkeypatch, grading, ["yes", "no"])
+
+    async def grade_by_bands():
+        similarities = await grading.document_similarities(workflow_stubs.question_embedding, documents)
+        return await grading.grade_relevance(QUESTION, documents, similarities)
+
+    grades = asyncio.run(grade_by_bands())
+
+    # relevant, borderline -> LLM "yes", irrelevant, borderline -> LLM "no"
+    assert grades == ["yes", "yes", "no", "no"]
+    assert graded == ["document 1", "document 3"]
+
+
+def test_document_similarities_match_stored_embeddings(workflow_stubs) -> None:
+    import workflow.nodes.grade_documents as grading
+
+    documents = [Document(id=f"doc-{i}", page_content="") for i in range(3)]
+    workflow_stubs.doc_embeddings = {
+        "doc-0": [2.0, 0.0], "doc-1": embedding_at(0.6), "doc-2": [0.0, 3.0]
+    }
+
+    similarities = asyncio.run(grading.document_similarities([1.0, 0.0], documents))
+
+    assert similarities == pytest.approx([1.0, 0.6, 0.0], abs=1e-6)
+
+
+@pytest.mark.parametrize(
+    "question_embedding, doc_ids",
+    [
+        (None, ["doc-0", "doc-1"]),  # question was never embedded
+        ([1.0, 0.0], ["doc-0", None]),  # document without an id
+        ([1.0, 0.0], ["doc-0", "doc-9"]),  # id not in the vectorstore
+    ],
+)
+def test_missing_embeddings_fall_back_to_llm_grading(
+    workflow_stubs, monkeypatch, question_embedding, doc_ids
+) -> None:
+    import workflow.nodes.grade_documents as grading
+
+    documents = [Document(id=i, page_content=f"document {n}") for n, i in enumerate(doc_ids)]
+    workflow_stubs.doc_embeddings = {"doc-0": [1.0, 0.0], "doc-1": [0.0, 1.0]}
+    graded = fake_grade_batch(monkeypatch, grading, ["no", "yes"])
+
+    assert asyncio.run(grading.document_similarities(question_embedding, documents)) is None
+    grades = asyncio.run(grading.grade_relevance(QUESTION, documents, None))
+
+    assert grades == ["no", "yes"]
+    assert graded == ["document 0", "document 1"]
+
+
+def test_similarity_bounds_come_from_environment(workflow_stubs, monkeypatch) -> None:
+    monkeypatch.setenv("GRADE_RELEVANT_SIMILARITY", "2")
+    monkeypatch.setenv("GRADE_IRRELEVANT_SIMILARITY", "-2")
+    import workflow.nodes.grade_documents as grading
+
+    graded = fake_grade_batch(monkeypatch, grading, ["no", "no"])
+    result = grade(workflow_stubs)
+
+    # Identical embeddings would be relevant by default; here the LLM decides
+    assert graded == ["document 0", "document 1"]
+    assert result["documents"] == []
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+
+def run_turn(question: str = "What is agent memory?") -> dict:
+    from workflow.graph import app
+
+    return asyncio.run(app.ainvoke({"question": question}))
+
+
+def test_grounded_useful_answer_ends_turn(workflow_stubs) -> None:
+    result = run_turn()
+
+    assert result["generation"] == "answer 1"
+    assert workflow_stubs.calls["generate"] == 1
+    assert result["accepted"] is True
+
+
+@pytest.mark.parametrize("route", ["vectorstore", "websearch"])
+def test_unsupported_answers_exhaust_budget_and_end_turn(workflow_stubs, route) -> None:
+    workflow_stubs.route = route
+    workflow_stubs.grounded = "no"
+
+    result = run_turn()
+
+    # (1 attempt + 1 retry) before and after the single web-search escalation
+    assert workflow_stubs.calls["generate"] == 4
+    assert result["generation"] == "answer 4"
+    assert result["accepted"] is False
+
+
+@pytest.mark.parametrize("route", ["vectorstore", "websearch"])
+def test_unhelpful_answers_exhaust_budget_and_end_turn(workflow_stubs, route) -> None:
+    workflow_stubs.route = route
+    workflow_stubs.useful = False
+
+    result = run_turn()
+
+    assert workflow_stubs.calls["generate"] == 2
+    assert result["accepted"] is False
+    assert workflow_stubs.calls["tavily"] <= 2
+
+
+def test_relevant_documents_do_not_wait_on_web_prefetch(workflow_stubs) -> None:
+    workflow_stubs.web_delay = 0.5
+
+    started = time.perf_counter()
+    run_turn()
+
+    assert time.perf_counter() - started < 0.3
+
+
+def test_web_search_uses_prefetched_result(workflow_stubs) -> None:
+    workflow_stubs.doc_embedding = [0.0, 1.0]
+
+    result = run_turn()
+
+    assert [doc.page_content for doc in result["documents"]] == ["web result"]
+    assert workflow_stubs.calls["tavily"] == 1
+
+
+def test_relevant_turns_make_no_web_search(workflow_stubs) -> None:
+    run_turn()
+    run_turn()
+
+    assert workflow_stubs.calls["tavily"] == 0
+
+
+def test_prefetch_is_cancelled_when_borderline_documents_pass(workflow_stubs) -> None:
+    from workflow.nodes import web_search
+
+    # cosine similarity 0.6: borderline, so the prefetch starts and the LLM grades "yes"
+    workflow_stubs.doc_embedding = [0.6, 0.8]
+    workflow_stubs.web_delay = 0.5
+
+    started = time.perf_counter()
+    result = run_turn()
+
+    assert len(result["documents"]) == 2
+    assert not web_search._web_prefetches
+    assert time.perf_counter() - started < 0.3
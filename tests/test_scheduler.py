@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from langchain.schema import Document
+from langchain_core.runnables import RunnableLambda
+
+from workflow.scheduler import GenerationScheduler, predict_output_tokens
+
+
+def test_predict_output_tokens_grows_with_prompt() -> None:
+    short = {"question": "q", "context": [Document(page_content="a" * 100)]}
+    long = {"question": "q", "context": [Document(page_content="a" * 10000)]}
+
+    assert predict_output_tokens(short) < predict_output_tokens(long)
+
+
+def test_scheduler_dispatches_shortest_first() -> None:
+    calls = []
+
+    async def record(inputs):
+        calls.append(inputs["question"])
+        return inputs["question"].upper()
+
+    async def run():
+        scheduler = GenerationScheduler(RunnableLambda(record), asyncio.Semaphore(1))
+        requests = [
+            {"question": "long", "context": [Document(page_content="a" * 10000)]},
+            {"question": "short", "context": [Document(page_content="a")]},
+        ]
+        return await asyncio.gather(*(scheduler.submit(r) for r in requests))
+
+    assert asyncio.run(run()) == ["LONG", "SHORT"]
+    assert calls == ["short", "long"]
+
+
+def test_scheduler_propagates_errors() -> None:
+    async def fail(inputs):
+        raise ValueError("boom")
+
+    async def run():
+        scheduler = GenerationScheduler(RunnableLambda(fail), asyncio.Semaphore(1))
+        return await scheduler.submit({"question": "q", "context": []})
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())